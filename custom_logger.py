@@ -1,38 +1,44 @@
 import logging
 
 
-def setup_logger(log_file):
+def setup_logger(log_file, console=True):
     """
     Sets up a logger for the project analysis.
 
     Args:
         log_file (str): Path to the log file.
+        console (bool): Whether to also log INFO and above to the console.
 
     Returns:
         logging.Logger: Configured logger.
     """
     try:
         logger = logging.getLogger("project_analyzer")
-        logger.setLevel(logging.DEBUG)
-
-        # File handler for logging to a file
-        fh = logging.FileHandler(log_file)
-        fh.setLevel(logging.DEBUG)
-
-        # Stream handler for logging to the console
-        ch = logging.StreamHandler()
-        ch.setLevel(logging.ERROR)
-
-        # Formatting the logs
+        # Already configured; adding handlers again would duplicate every log line
+        if logger.handlers:
+            return logger
+        # Records below INFO are dropped here, before any handler formats them
+        logger.setLevel(logging.INFO)
+        # The handlers below are the only output; don't pass records to the root logger
+        logger.propagate = False
+
+        # Formatting the logs, shared by all handlers
         formatter = logging.Formatter(
             "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
         )
-        fh.setFormatter(formatter)
-        ch.setFormatter(formatter)
 
-        # Adding handlers to the logger
+        # File handler for logging to a file
+        fh = logging.FileHandler(log_file)
+        fh.setLevel(logging.INFO)
+        fh.setFormatter(formatter)
         logger.addHandler(fh)
-        logger.addHandler(ch)
+
+        # Stream handler for logging to the console
+        if console:
+            ch = logging.StreamHandler()
+            ch.setLevel(logging.INFO)
+            ch.setFormatter(formatter)
+            logger.addHandler(ch)
 
         return logger
     except Exception as e:
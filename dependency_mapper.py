@@ -1,150 +1,233 @@
 import re
 from urllib.parse import urlparse
 from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import contextlib
+import functools
+import mmap
+import multiprocessing
 import os
+import string
+import sys
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional; fall back to per-method regexes
+    ahocorasick = None
+
+# Regex patterns to identify various types of dependencies and methods. They live at
+# module level so the worker processes scanning files can use them, and match raw
+# bytes since every pattern is ASCII; only the matched spans are decoded.
+# Each dependency pattern captures the dependency in a named group so the
+# patterns can be combined into a single alternation and scanned in one pass.
+DEPENDENCY_PATTERNS = [
+    rb'(?:import|require)\s+[\'"](?P<js_import>.+?)[\'"]',  # JavaScript import/require
+    rb'<!--\s*#include\s*file\s*=\s*[\'"](?P<html_include>.+?)[\'"]\s*-->',  # HTML includes
+    rb'(?P<url>https?://[^\s\'"]+)',  # API URLs (HTTP/HTTPS links)
+    rb'<Compile Include="(?P<compile_include>.+?)"',  # VBProj includes
+    rb'<ProjectReference Include="(?P<project_reference>.+?)"',  # Project references in .vbproj and .sln
+]
+DEPENDENCY_PATTERN = re.compile(b"|".join(DEPENDENCY_PATTERNS))
+METHOD_PATTERN = re.compile(
+    rb"function\s+(\w+)\s*\("
+)  # JavaScript/VB method definitions
+LOCALHOST_PATTERN = re.compile(rb"localhost:(\d+)")  # Localhost with port
+# Literal anchors of the dependency patterns, used to skip lines that cannot match
+DEPENDENCY_LITERALS = (
+    b"import",
+    b"require",
+    b"#include",
+    b"http",
+    b"<Compile",
+    b"<ProjectReference",
+)
+# Characters matched by \w in the bytes patterns
+WORD_CHARS = frozenset(string.ascii_letters + string.digits + "_")
 
 
 class DependencyMapper:
-    def __init__(self, logger, base_path):
+    def __init__(self, logger, base_path, max_workers=None):
         """
         Initializes the DependencyMapper with a logger and sets up regex patterns for dependencies and methods.
 
         Args:
             logger (logging.Logger): Logger instance for logging information.
             base_path (str): Base path for saving logs.
+            max_workers (int): Number of processes scanning files. Defaults to the CPU count,
+                capped at 61 on Windows, where ProcessPoolExecutor allows no more.
         """
         self.logger = logger
         self.base_path = base_path
-        # Regex patterns to identify various types of dependencies and methods
-        self.dependency_patterns = [
-            re.compile(
-                r'(import|require)\s+[\'"](.+?)[\'"]'
-            ),  # JavaScript import/require
-            re.compile(
-                r'<!--\s*#include\s*file\s*=\s*[\'"](.+?)[\'"]\s*-->'
-            ),  # HTML includes
-            re.compile(r'(https?://[^\s\'"]+)'),  # API URLs (HTTP/HTTPS links)
-            re.compile(r'<Compile Include="(.+?)"'),  # VBProj includes
-            re.compile(
-                r'<ProjectReference Include="(.+?)"'
-            ),  # Project references in .vbproj and .sln
-        ]
-        self.method_pattern = re.compile(
-            r"function\s+(\w+)\s*\("
-        )  # JavaScript/VB method definitions
+        self.max_workers = max_workers or _default_workers()
         self.localhost_pattern = re.compile(r"localhost:(\d+)")  # Localhost with port
-        self.supported_extensions = (".vb", ".vue", ".js")
+        # Only these files are opened; .html, .vbproj and .sln carry the include and
+        # project reference patterns
+        self.supported_extensions = (".vb", ".vue", ".js", ".html", ".vbproj", ".sln")
+        # The same URLs recur across files, so cache their parsed root domains
+        self._root_domain = functools.lru_cache(maxsize=4096)(self._parse_root_domain)
 
     def map_dependencies_and_methods(self, projects):
         """
         Maps dependencies and shared methods across multiple projects.
 
         Args:
-            projects (list): List of projects with their respective files.
+            projects (iterable): Projects with their respective files. They are
+                consumed once, one at a time, so a generator can produce them while
+                earlier projects are being mapped. An optional "stats" entry with the
+                FileStat of each file lets empty files be skipped unopened.
 
         Returns:
             tuple: Two dictionaries containing dependency maps and method usage maps respectively.
         """
         dependency_map = {}
-        method_usage_map = {}
+        # Files per method name; dict keys deduplicate while keeping first-seen order
+        method_usage_map = defaultdict(dict)
         localhost_map = {}
+        # (dependency list, index, port) of localhost dependencies to translate
+        localhost_dependencies = []
         domain_count = Counter()
 
         try:
-            for project in projects:
-                self.logger.info(f"Mapping dependencies for project: {project['name']}")
-                dependencies = []
-                methods = {}
+            with ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=_worker_context()
+            ) as executor:
+                for project in projects:
+                    self.logger.info(
+                        "Mapping dependencies for project: %s", project["name"]
+                    )
+                    dependencies = []
+                    methods = defaultdict(list)
+                    scanned_files = []
+                    source_files = [
+                        file
+                        for file in project["files"]
+                        if file.lower().endswith(self.supported_extensions)
+                    ]
+                    # Empty files hold nothing to find, so they aren't handed to a
+                    # worker process
+                    stats = project.get("stats")
+                    if stats:
+                        source_files = [
+                            file
+                            for file in source_files
+                            if file not in stats or stats[file].size
+                        ]
 
-                for file in project["files"]:
-                    if not file.endswith(self.supported_extensions):
-                        continue
-                    try:
-                        with open(file, "r", encoding="utf-8") as f:
-                            content = f.read()
-
-                            # Find localhost endpoints
-                            localhost_matches = self.localhost_pattern.findall(content)
-                            for port in localhost_matches:
-                                localhost_map[port] = project["name"]
-
-                            # Find dependencies
-                            for pattern in self.dependency_patterns:
-                                matches = pattern.findall(content)
-                                for match in matches:
-                                    dependency = (
-                                        match[1] if isinstance(match, tuple) else match
+                    # First pass: collect endpoints, dependencies and method definitions
+                    results = executor.map(
+                        _scan_file,
+                        source_files,
+                        chunksize=self._chunksize(len(source_files)),
+                    )
+                    for file, ports, file_dependencies, file_methods, error in results:
+                        if error:
+                            # Log any errors that occur during file reading
+                            self.logger.error("Failed to read file %s: %s", file, error)
+                            continue
+                        scanned_files.append(file)
+
+                        for port in ports:
+                            localhost_map[port] = project["name"]
+
+                        for dependency in file_dependencies:
+                            if "localhost" in dependency:
+                                match = self.localhost_pattern.search(dependency)
+                                if match:
+                                    localhost_dependencies.append(
+                                        (
+                                            dependencies,
+                                            len(dependencies),
+                                            match.group(1),
+                                        )
                                     )
-                                    # Skip npmjs.org references
-                                    if "npmjs.org" in dependency:
-                                        continue
-                                    dependencies.append(dependency)
-                                    # Extract domain and count occurrences
-                                    domain = self.extract_domain(dependency)
-                                    if domain:
-                                        root_domain = self.get_root_domain(domain)
-                                        domain_count[root_domain] += 1
-
-                            # Find method definitions
-                            method_matches = self.method_pattern.findall(content)
-                            for method in method_matches:
-                                method_name = f"{method}_{os.path.basename(file)}"
-                                if method_name not in methods:
-                                    methods[method_name] = []
-                                methods[method_name].append(file)
-
-                            # Find method usages
-                            for method_name in methods:
-                                method = method_name.split("_")[0]
-                                usage_pattern = re.compile(
-                                    r"\b" + re.escape(method) + r"\b"
-                                )
-                                if usage_pattern.search(content):
-                                    if method_name not in method_usage_map:
-                                        method_usage_map[method_name] = []
-                                    method_usage_map[method_name].append(file)
+                            dependencies.append(dependency)
+                            # Extract domain and count occurrences
+                            root_domain = self._root_domain(dependency)
+                            if root_domain:
+                                domain_count[root_domain] += 1
 
-                    except Exception as e:
-                        # Log any errors that occur during file reading
-                        self.logger.error(f"Failed to read file {file}: {str(e)}")
+                        if file_methods:
+                            # Paths are joined with os.sep, so this is the file name
+                            file_name = file.rpartition(os.sep)[2]
+                            for method in file_methods:
+                                methods[f"{method}_{file_name}"].append(file)
+
+                    # Second pass: find method usages once all definitions are known
+                    method_names_by_method = defaultdict(list)
+                    for method_name in methods:
+                        method = method_name.split("_")[0]
+                        if method:
+                            method_names_by_method[method].append(method_name)
+                    if method_names_by_method:
+                        usage_methods = tuple(method_names_by_method)
+                        results = executor.map(
+                            _scan_usages,
+                            scanned_files,
+                            repeat(usage_methods),
+                            chunksize=self._chunksize(len(scanned_files)),
+                        )
+                        for file, used, error in results:
+                            if error:
+                                self.logger.error(
+                                    "Failed to read file %s: %s", file, error
+                                )
+                                continue
+                            for method in used:
+                                for method_name in method_names_by_method[method]:
+                                    method_usage_map[method_name][file] = None
 
-                dependency_map[project["name"]] = dependencies
-                for method_name, files in methods.items():
-                    if method_name not in method_usage_map:
-                        method_usage_map[method_name] = []
-                    method_usage_map[method_name].extend(files)
+                    dependency_map[project["name"]] = dependencies
+                    for method_name, files in methods.items():
+                        method_usage_map[method_name].update(dict.fromkeys(files))
 
         except Exception as e:
             # Log any errors that occur during dependency mapping
-            self.logger.error(f"Failed to map dependencies: {str(e)}")
-
-        # Deduplicate method usage entries
-        for method_name in method_usage_map:
-            method_usage_map[method_name] = list(set(method_usage_map[method_name]))
-
-        # Translate localhost dependencies to project names
-        for project, dependencies in dependency_map.items():
-            translated_dependencies = []
-            for dependency in dependencies:
-                if "localhost" in dependency:
-                    match = self.localhost_pattern.search(dependency)
-                    if match:
-                        port = match.group(1)
-                        if port in localhost_map:
-                            translated_dependencies.append(localhost_map[port])
-                        else:
-                            translated_dependencies.append(dependency)
-                    else:
-                        translated_dependencies.append(dependency)
-                else:
-                    translated_dependencies.append(dependency)
-            dependency_map[project] = translated_dependencies
+            self.logger.error("Failed to map dependencies: %s", e)
+
+        # Convert the deduplicated method usage entries to lists
+        method_usage_map = {
+            method_name: list(files) for method_name, files in method_usage_map.items()
+        }
+
+        # Translate localhost dependencies to project names now that every
+        # project's endpoints are known
+        for dependencies, index, port in localhost_dependencies:
+            if port in localhost_map:
+                dependencies[index] = localhost_map[port]
 
         # Log domain references
         self.log_domain_references(domain_count)
 
         return dependency_map, method_usage_map
 
+    def _chunksize(self, count):
+        """
+        Picks how many files to hand a worker process at once.
+
+        Args:
+            count (int): Number of files to scan.
+
+        Returns:
+            int: Chunk size for ProcessPoolExecutor.map.
+        """
+        return max(1, count // (self.max_workers * 4))
+
+    def _parse_root_domain(self, dependency):
+        """
+        Extracts the root domain of a dependency. Wrapped in an LRU cache in __init__.
+
+        Args:
+            dependency (str): The dependency to extract the root domain from.
+
+        Returns:
+            str: The root domain or None if the dependency has no domain.
+        """
+        domain = self.extract_domain(dependency)
+        if domain:
+            return self.get_root_domain(domain)
+        return None
+
     def extract_domain(self, url):
         """
         Extracts the domain from a URL.
@@ -159,7 +242,7 @@ class DependencyMapper:
             parsed_url = urlparse(url)
             return parsed_url.netloc
         except Exception as e:
-            self.logger.error(f"Failed to extract domain from URL {url}: {str(e)}")
+            self.logger.error("Failed to extract domain from URL %s: %s", url, e)
             return None
 
     def get_root_domain(self, domain):
@@ -189,4 +272,200 @@ class DependencyMapper:
         with open(log_file, "w") as f:
             for domain, count in sorted_domains:
                 f.write(f"{domain}: {count}\n")
-        self.logger.info(f"Domain references logged to {log_file}")
+        self.logger.info("Domain references logged to %s", log_file)
+
+
+def _default_workers():
+    """
+    Picks the default number of worker processes the way ProcessPoolExecutor does.
+
+    Windows can't wait on more than 61 worker processes, and ProcessPoolExecutor
+    rejects an explicit count above that there.
+
+    Returns:
+        int: Number of worker processes.
+    """
+    workers = os.cpu_count() or 1
+    if sys.platform == "win32":
+        workers = min(workers, 61)
+    return workers
+
+
+def _worker_context():
+    """
+    Picks how the worker processes are started.
+
+    The projects may still be walked by other threads while the pool starts, and
+    forking a multi-threaded process can deadlock the child, so workers are started
+    from a fresh interpreter instead: through a fork server where available, spawned
+    elsewhere.
+
+    Returns:
+        multiprocessing.context.BaseContext: Context for ProcessPoolExecutor.
+    """
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def _scan_file(file):
+    """
+    Scans a file for localhost endpoints, dependencies and method definitions.
+
+    Runs in a worker process, so errors are returned rather than logged.
+
+    Args:
+        file (str): Path to the file.
+
+    Returns:
+        tuple: The file, its localhost ports, dependencies, method names and an error
+            message (None on success).
+    """
+    ports = []
+    dependencies = []
+    methods = []
+    try:
+        with _map_file(file) as content:
+            # Each regex scan only runs when a literal its pattern needs occurs.
+            # mmap's "in" tests single bytes, so substrings are looked up with find.
+
+            # Find localhost endpoints
+            if content.find(b"localhost") != -1:
+                for match in LOCALHOST_PATTERN.finditer(content):
+                    ports.append(match.group(1).decode("ascii"))
+
+            # Find dependencies
+            if any(content.find(literal) != -1 for literal in DEPENDENCY_LITERALS):
+                for match in DEPENDENCY_PATTERN.finditer(content):
+                    dependency = match.group(match.lastgroup)
+                    # Skip npmjs.org references
+                    if b"npmjs.org" in dependency:
+                        continue
+                    dependencies.append(dependency.decode("utf-8", "replace"))
+
+            # Find method definitions
+            if content.find(b"function") != -1:
+                for match in METHOD_PATTERN.finditer(content):
+                    methods.append(match.group(1).decode("ascii"))
+    except Exception as e:
+        return file, [], [], [], str(e)
+    return file, ports, dependencies, methods, None
+
+
+def _scan_usages(file, methods):
+    """
+    Streams a file and finds which of the given methods it uses.
+
+    Runs in a worker process, so errors are returned rather than logged.
+
+    Args:
+        file (str): Path to the file.
+        methods (tuple): Method names to look for.
+
+    Returns:
+        tuple: The file, the used methods in order of first usage and an error
+            message (None on success).
+    """
+    used = {}
+    matcher = _usage_matcher(methods)
+    try:
+        with _map_file(file) as content:
+            if not content:
+                return file, used, None
+            if ahocorasick is not None:
+                # The automaton needs str; decode line by line to keep copies small.
+                # Latin-1 maps each byte to one character, keeping match offsets intact.
+                for line in iter(content.readline, b""):
+                    used.update(_find_usages(matcher, line.decode("latin-1")))
+            else:
+                for method, usage_pattern in matcher:
+                    if usage_pattern.search(content):
+                        used[method] = None
+    except Exception as e:
+        return file, {}, str(e)
+    return file, used, None
+
+
+@contextlib.contextmanager
+def _map_file(file):
+    """
+    Maps a file read-only into memory so scans read straight from the page cache.
+
+    Args:
+        file (str): Path to the file.
+
+    Yields:
+        mmap.mmap or bytes: The file content; empty files cannot be mapped and
+            yield empty bytes instead.
+    """
+    with open(file, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                yield content
+
+
+@functools.lru_cache(maxsize=1)
+def _usage_matcher(methods):
+    """
+    Builds the usage matcher for a project's methods, once per worker process.
+
+    Args:
+        methods (tuple): Method names to look for.
+
+    Returns:
+        ahocorasick.Automaton or list: An automaton matching every method in a single
+            sweep, or (method, compiled usage pattern) pairs without pyahocorasick.
+    """
+    if ahocorasick is None:
+        return [(method, _usage_pattern(method)) for method in methods]
+
+    automaton = ahocorasick.Automaton()
+    for method in methods:
+        automaton.add_word(method, (len(method), method))
+    automaton.make_automaton()
+    return automaton
+
+
+@functools.lru_cache(maxsize=None)
+def _usage_pattern(method):
+    """
+    Returns the compiled word-boundary usage pattern for a method, compiling it only once.
+
+    The patterns are cached here rather than in the re module, whose small internal
+    cache is cleared once a codebase has more method names than it holds.
+
+    Args:
+        method (str): The method name to match.
+
+    Returns:
+        re.Pattern: Compiled bytes usage pattern.
+    """
+    # Method names are captured by METHOD_PATTERN's (\w+), so they are plain ASCII
+    # identifiers with nothing to escape
+    return re.compile(rb"\b" + method.encode("ascii") + rb"\b")
+
+
+def _find_usages(automaton, content):
+    """
+    Finds the methods used in the content with a single automaton sweep.
+
+    Args:
+        automaton (ahocorasick.Automaton): Automaton built by _usage_matcher.
+        content (str): Content to scan.
+
+    Returns:
+        dict: Used methods, in order of first usage.
+    """
+    used = {}
+    last = len(content) - 1
+    for end, (length, method) in automaton.iter(content):
+        # Only accept whole-word matches, mirroring the \b anchors of the regex
+        start = end - length + 1
+        if start > 0 and content[start - 1] in WORD_CHARS:
+            continue
+        if end < last and content[end + 1] in WORD_CHARS:
+            continue
+        used[method] = None
+    return used
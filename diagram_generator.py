@@ -1,6 +1,7 @@
 import graphviz
+from graphviz.quoting import attr_list, quote
+import hashlib
 import os
-import subprocess
 
 
 class DiagramGenerator:
@@ -14,7 +15,14 @@ class DiagramGenerator:
         self.logger = logger
 
     def generate_dot_file(
-        self, dependency_map, shared_methods, output_file, include_methods=True
+        self,
+        dependency_map,
+        shared_methods,
+        output_file,
+        include_methods=True,
+        file_to_project=None,
+        save_dot=True,
+        render=True,
     ):
         """
         Generates a DOT file for visualizing dependencies and shared methods.
@@ -24,60 +32,181 @@ class DiagramGenerator:
             shared_methods (dict): Dictionary of shared methods across projects.
             output_file (str): Path to the output DOT file.
             include_methods (bool): Whether to include method dependencies in the DOT file.
+            file_to_project (dict): Project name for each file path. When omitted, project
+                names are derived from the file paths.
+            save_dot (bool): Whether to also save the DOT source; the PDF is rendered
+                from memory either way.
+            render (bool): Whether to render the PDF. Rendering is skipped anyway when
+                the PDF exists and was rendered from the same DOT source.
+
+        Returns:
+            bool: True if the PDF was rendered, False if it was skipped or failed.
         """
         try:
-            dot = graphviz.Digraph(comment="Project Dependencies and Methods")
-
-            # Add nodes for each project
-            for project in dependency_map:
-                self.logger.info(f"Adding node for project: {project}")
-                dot.node(project, project)
-
-            # Track added edges to prevent duplicates
-            added_edges = set()
-
-            # Add edges for dependencies
-            for project, dependencies in dependency_map.items():
-                for dependency in dependencies:
-                    edge = (project, dependency)
-                    if edge not in added_edges:
-                        self.logger.info(f"Adding edge from {project} to {dependency}")
-                        # Properly format URLs by quoting and escaping them
-                        if dependency.startswith(("http://", "https://")):
-                            formatted_dependency = dependency.replace(":", "\\:")
-                            dot.edge(project, formatted_dependency, label="uses")
-                        else:
-                            dot.edge(project, dependency, label="uses")
-                        added_edges.add(edge)
-
-            # Add edges for shared methods if include_methods is True
+            dot = _new_graph()
+            dot.body.extend(self._dependency_lines(dependency_map))
             if include_methods:
-                for method, files in shared_methods.items():
-                    method_node = f"method_{method}"
-                    self.logger.info(f"Adding method node: {method_node}")
-                    dot.node(method_node, method, shape="box")
-                    for file in files:
-                        project_name = self.extract_project_name(file)
-                        edge = (project_name, method_node)
-                        if edge not in added_edges:
-                            self.logger.info(
-                                f"Adding edge from {project_name} to {method_node}"
-                            )
-                            dot.edge(project_name, method_node, label="has method")
-                            added_edges.add(edge)
-
-            # Save the DOT file
-            dot.save(output_file)
-            self.logger.info(f"Dependency diagram saved to {output_file}")
+                dot.body.extend(self._method_lines(shared_methods, file_to_project))
+            return self._output_graph(dot, output_file, save_dot, render)
+
+        except Exception as e:
+            self.logger.error("Failed to generate DOT file: %s", e)
+            return False
+
+    def generate_dot_file_pair(
+        self,
+        dependency_map,
+        shared_methods,
+        path_projects,
+        path_all,
+        file_to_project=None,
+        save_dot=True,
+        render=True,
+    ):
+        """
+        Generates the project-only and the full DOT files together.
 
-            # Render the DOT file to a PDF file using subprocess
-            output_pdf = output_file.replace(".dot", ".pdf")
-            self.logger.info(f"Rendering DOT file to PDF: {output_pdf}")
-            self.render_dot_to_pdf(output_file, output_pdf)
-            self.logger.info(f"Dependency diagram rendered to {output_pdf}")
+        The project-only graph is the full graph without the method nodes, so the
+        dependency lines are built once and shared by both graphs.
 
+        Args:
+            dependency_map (dict): Dictionary of project dependencies.
+            shared_methods (dict): Dictionary of shared methods across projects.
+            path_projects (str): Path to the DOT file without method dependencies.
+            path_all (str): Path to the DOT file including method dependencies.
+            file_to_project (dict): Project name for each file path. When omitted, project
+                names are derived from the file paths.
+            save_dot (bool): Whether to also save the DOT sources.
+            render (bool): Whether to render the PDFs.
+
+        Returns:
+            tuple: Whether each PDF, project-only then full, was rendered.
+        """
+        try:
+            dependency_lines = self._dependency_lines(dependency_map)
         except Exception as e:
-            self.logger.error(f"Failed to generate DOT file: {str(e)}")
+            self.logger.error("Failed to generate DOT files: %s", e)
+            return False, False
+
+        # Each graph is output on its own, so a failure leaves the other intact
+        try:
+            projects_dot = _new_graph()
+            projects_dot.body.extend(dependency_lines)
+            projects_rendered = self._output_graph(
+                projects_dot, path_projects, save_dot, render
+            )
+        except Exception as e:
+            self.logger.error("Failed to generate DOT file %s: %s", path_projects, e)
+            projects_rendered = False
+
+        try:
+            all_dot = _new_graph()
+            all_dot.body.extend(dependency_lines)
+            all_dot.body.extend(self._method_lines(shared_methods, file_to_project))
+            all_rendered = self._output_graph(all_dot, path_all, save_dot, render)
+        except Exception as e:
+            self.logger.error("Failed to generate DOT file %s: %s", path_all, e)
+            all_rendered = False
+
+        return projects_rendered, all_rendered
+
+    def _dependency_lines(self, dependency_map):
+        """
+        Builds the DOT lines of the project nodes and their dependency edges.
+
+        Args:
+            dependency_map (dict): Dictionary of project dependencies.
+
+        Returns:
+            list: DOT body lines.
+        """
+        # Node names are quoted as plain IDs so colons in URLs are not read as ports
+        lines = []
+        for project in dependency_map:
+            self.logger.info("Adding node for project: %s", project)
+            lines.append(f"\t{quote(project)}{attr_list(project)}\n")
+
+        uses = attr_list("uses")
+        edge_count = 0
+        for project, dependencies in dependency_map.items():
+            quoted_project = quote(project)
+            for dependency in dict.fromkeys(dependencies):
+                lines.append(f"\t{quoted_project} -> {quote(dependency)}{uses}\n")
+                edge_count += 1
+        self.logger.info("Added %d dependency edges", edge_count)
+        return lines
+
+    def _method_lines(self, shared_methods, file_to_project=None):
+        """
+        Builds the DOT lines of the method nodes and the edges of the projects having
+        them.
+
+        Args:
+            shared_methods (dict): Dictionary of shared methods across projects.
+            file_to_project (dict): Project name for each file path. When omitted, project
+                names are derived from the file paths.
+
+        Returns:
+            list: DOT body lines.
+        """
+        has_method = attr_list("has method")
+        lines = []
+        for method, files in shared_methods.items():
+            method_node = f"method_{method}"
+            quoted_method_node = quote(method_node)
+            lines.append(
+                f"\t{quoted_method_node}{attr_list(method, kwargs={'shape': 'box'})}\n"
+            )
+            if file_to_project is not None:
+                project_names = [file_to_project.get(file, "unknown") for file in files]
+            else:
+                project_names = [self.extract_project_name(file) for file in files]
+            for project_name in dict.fromkeys(project_names):
+                lines.append(
+                    f"\t{quote(project_name)} -> {quoted_method_node}{has_method}\n"
+                )
+        self.logger.info("Added %d method nodes and their edges", len(shared_methods))
+        return lines
+
+    def _output_graph(self, dot, output_file, save_dot=True, render=True):
+        """
+        Saves a graph's DOT source and renders it to a PDF unless it is unchanged.
+
+        Args:
+            dot (graphviz.Digraph): Graph to output.
+            output_file (str): Path to the output DOT file.
+            save_dot (bool): Whether to save the DOT source.
+            render (bool): Whether to render the PDF.
+
+        Returns:
+            bool: True if the PDF was rendered, False if it was skipped or failed.
+        """
+        # Save the DOT file
+        if save_dot:
+            dot.save(output_file)
+            self.logger.info("Dependency diagram saved to %s", output_file)
+
+        if not render:
+            return False
+
+        # Skip Graphviz when the PDF was already rendered from the same source
+        output_pdf = output_file.replace(".dot", ".pdf")
+        hash_file = f"{output_pdf}.hash"
+        source_hash = hashlib.blake2b(
+            dot.source.encode("utf-8"), digest_size=16
+        ).hexdigest()
+        if os.path.exists(output_pdf) and _read_hash(hash_file) == source_hash:
+            self.logger.info("Dependency diagram unchanged, keeping %s", output_pdf)
+            return False
+
+        # Render the graph to a PDF file by piping it through Graphviz
+        self.logger.info("Rendering DOT file to PDF: %s", output_pdf)
+        if not self.render_dot_to_pdf(dot, output_pdf):
+            return False
+        self.logger.info("Dependency diagram rendered to %s", output_pdf)
+        with open(hash_file, "w", encoding="utf-8") as f:
+            f.write(source_hash)
+        return True
 
     def extract_project_name(self, file_path):
         """
@@ -94,28 +223,58 @@ class DiagramGenerator:
             return parts[-3]  # Adjust this based on your directory structure
         except Exception as e:
             self.logger.error(
-                f"Failed to extract project name from {file_path}: {str(e)}"
+                "Failed to extract project name from %s: %s", file_path, e
             )
             return "unknown"
 
-    def render_dot_to_pdf(self, dot_file, pdf_file):
+    def render_dot_to_pdf(self, dot, pdf_file):
         """
-        Renders a DOT file to a PDF using the Graphviz dot command.
+        Renders a graph to a PDF by piping its source straight into Graphviz.
 
         Args:
-            dot_file (str): Path to the DOT file.
+            dot (graphviz.Digraph): Graph to render.
             pdf_file (str): Path to the output PDF file.
+
+        Returns:
+            bool: True if the PDF was written.
         """
         try:
-            command = ["dot", "-Tpdf", dot_file, "-o", pdf_file]
-            self.logger.info(f"Running command: {' '.join(command)}")
-            result = subprocess.run(command, check=True, capture_output=True, text=True)
-            self.logger.info(f"dot command output: {result.stdout}")
-            if result.stderr:
-                self.logger.error(f"dot command error: {result.stderr}")
-        except subprocess.CalledProcessError as e:
+            pdf = dot.pipe(format="pdf")
+            with open(pdf_file, "wb") as f:
+                f.write(pdf)
+            return True
+        except graphviz.CalledProcessError as e:
             self.logger.error(
-                f"Failed to render DOT file to PDF: {str(e)}, stderr: {e.stderr}"
+                "Failed to render DOT file to PDF: %s, stderr: %s", e, e.stderr
             )
         except Exception as e:
-            self.logger.error(f"Unexpected error during PDF rendering: {str(e)}")
+            self.logger.error("Unexpected error during PDF rendering: %s", e)
+        return False
+
+
+def _new_graph():
+    """
+    Creates an empty dependency graph.
+
+    Returns:
+        graphviz.Digraph: The graph.
+    """
+    # A strict graph lets Graphviz merge any duplicate edges itself
+    return graphviz.Digraph(comment="Project Dependencies and Methods", strict=True)
+
+
+def _read_hash(hash_file):
+    """
+    Reads the source hash stored next to a rendered PDF.
+
+    Args:
+        hash_file (str): Path to the hash file.
+
+    Returns:
+        str: The stored hash, or None if there is none.
+    """
+    try:
+        with open(hash_file, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
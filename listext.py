@@ -1,5 +1,5 @@
 import os
-from collections import defaultdict
+from collections import Counter
 
 
 def count_file_extensions(directory):
@@ -10,14 +10,26 @@ def count_file_extensions(directory):
         directory (str): Path to the directory.
 
     Returns:
-        dict: Dictionary with file extensions as keys and their counts as values.
+        Counter: Counter with file extensions as keys and their counts as values.
     """
-    extension_count = defaultdict(int)
-
-    for root, _, files in os.walk(directory):
-        for file in files:
-            _, ext = os.path.splitext(file)
-            extension_count[ext] += 1
+    extension_count = Counter()
+    directories = [directory]
+
+    # Walk the tree with scandir, whose entries already know whether they are directories
+    while directories:
+        try:
+            entries = os.scandir(directories.pop())
+        except OSError:
+            # Like os.walk, skip directories that cannot be read
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir():
+                    # Like os.walk, don't descend into symlinked directories
+                    if not entry.is_symlink():
+                        directories.append(entry.path)
+                else:
+                    extension_count[os.path.splitext(entry.name)[1]] += 1
 
     return extension_count
 
@@ -26,14 +38,9 @@ def main():
     directory = r"c:\devsv\forgpt"
     extension_count = count_file_extensions(directory)
 
-    # Sort the extensions by count
-    sorted_extensions = sorted(
-        extension_count.items(), key=lambda item: item[1], reverse=True
-    )
-
-    # Print the results
+    # Print the results, sorted by count
     print("File extension counts (sorted by number of files):")
-    for ext, count in sorted_extensions:
+    for ext, count in extension_count.most_common():
         print(f"{ext}: {count}")
 
 
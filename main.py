@@ -1,87 +1,142 @@
+import functools
 import json
 import os
-import logging
+import pathlib
+import sys
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    orjson = None
+
 from project_analyzer import ProjectAnalyzer
 from dependency_mapper import DependencyMapper
 from diagram_generator import DiagramGenerator
 from custom_logger import setup_logger
 
+# Set up before the configuration is loaded, so it cannot come from config.json
+LOG_FILE = "project_analysis.log"
 
-def load_config():
+
+@functools.lru_cache(maxsize=1)
+def load_config(logger):
     """
     Loads the configuration from config.json file.
 
+    The parsed configuration is cached, so repeated calls don't reopen the file;
+    treat the returned dictionary as read-only.
+
+    Args:
+        logger (logging.Logger): Logger instance for logging errors.
+
     Returns:
         dict: Configuration dictionary.
     """
     try:
-        with open("config.json", "r") as f:
-            config = json.load(f)
-        return config
+        # json.loads decodes bytes itself, skipping the text-mode file wrapper
+        return json.loads(pathlib.Path("config.json").read_bytes())
     except Exception as e:
-        logger = setup_logger("error.log")
-        logger.error(f"Failed to load configuration: {str(e)}")
+        logger.error("Failed to load configuration: %s", e)
         raise
 
 
+def _track_projects(projects, file_to_project):
+    """
+    Passes projects through while mapping each of their files to the project name.
+
+    Args:
+        projects (iterable): Projects with their respective files.
+        file_to_project (dict): Filled with the project name of each file.
+
+    Yields:
+        dict: The projects, unchanged.
+    """
+    for project in projects:
+        file_to_project.update(dict.fromkeys(project["files"], project["name"]))
+        yield project
+
+
+def _write_json(obj):
+    """
+    Prints an object as indented JSON to stdout.
+
+    orjson encodes straight to UTF-8 bytes in C, which are written to the binary
+    stdout; without it, or when stdout has no binary buffer, the stdlib encoder
+    streams to stdout instead of building one large string.
+
+    Args:
+        obj (dict): Object to print.
+    """
+    stdout = sys.stdout
+    if stdout is None:
+        # Like print, write nothing when there is no stdout, as under pythonw
+        return
+    # Replaced streams such as io.StringIO have no binary buffer to write bytes to
+    buffer = getattr(stdout, "buffer", None)
+    if orjson is not None and buffer is not None:
+        try:
+            data = orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            # Paths of undecodable file names hold lone surrogates, which orjson
+            # rejects; the stdlib encoder escapes them
+            pass
+        else:
+            # Flush pending text first so the output stays in order
+            stdout.flush()
+            buffer.write(data)
+            buffer.write(b"\n")
+            return
+    json.dump(obj, stdout, indent=2)
+    stdout.write("\n")
+
+
 def main():
     """
     Main function to perform project analysis, dependency mapping, and diagram generation.
     """
-    # Load configuration
-    config = load_config()
+    # Setup logger first so configuration errors are logged too
+    logger = setup_logger(LOG_FILE)
 
-    # Setup logger
+    # Load configuration
+    config = load_config(logger)
     base_path = config["root_folder_path"]
-    log_file = os.path.join(base_path, "project_analysis.log")
     output_dot_file_projects = os.path.join(base_path, "project_dependencies.dot")
     output_dot_file_all = os.path.join(base_path, "all_dependencies.dot")
 
-    logger = setup_logger(log_file)
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(logging.INFO)
-    logger.addHandler(console_handler)
-
     try:
         root_folder_path = config["root_folder_path"]
 
         # Initialize ProjectAnalyzer and analyze projects
-        analyzer = ProjectAnalyzer(logger)
-        logger.info("Starting project analysis...")
-        projects = analyzer.analyze_projects(root_folder_path)
-        logger.info("Project analysis completed.")
-
-        # Initialize DependencyMapper and map dependencies and methods
+        analyzer = ProjectAnalyzer(
+            logger, cache_dir=os.path.join(base_path, ".code_map_cache")
+        )
+        # Initialize DependencyMapper and map the projects as they are analyzed
         mapper = DependencyMapper(logger, base_path)
-        logger.info("Starting dependency mapping...")
-        dependency_map, shared_methods = mapper.map_dependencies_and_methods(projects)
-        logger.info("Dependency mapping completed.")
+        file_to_project = {}
+        logger.info("Starting project analysis and dependency mapping...")
+        dependency_map, shared_methods = mapper.map_dependencies_and_methods(
+            _track_projects(
+                analyzer.analyze_projects(root_folder_path), file_to_project
+            )
+        )
+        logger.info("Project analysis and dependency mapping completed.")
 
-        # Generate project and external API dependencies diagram
+        # Generate the project and external API dependencies diagram along with the
+        # full dependencies diagram including methods
         diagram_generator = DiagramGenerator(logger)
-        logger.info(
-            "Starting diagram generation for project and external API dependencies..."
-        )
-        diagram_generator.generate_dot_file(
+        logger.info("Starting diagram generation...")
+        diagram_generator.generate_dot_file_pair(
             dependency_map,
             shared_methods,
             output_dot_file_projects,
-            include_methods=False,
-        )
-        logger.info(
-            "Diagram generation for project and external API dependencies completed."
-        )
-
-        # Generate full dependencies diagram including methods
-        logger.info("Starting diagram generation for all dependencies...")
-        diagram_generator.generate_dot_file(
-            dependency_map, shared_methods, output_dot_file_all, include_methods=True
+            output_dot_file_all,
+            file_to_project=file_to_project,
         )
-        logger.info("Diagram generation for all dependencies completed.")
+        logger.info("Diagram generation completed.")
 
         # Print the results
-        print(json.dumps(dependency_map, indent=4))
-        print(json.dumps(shared_methods, indent=4))
+        _write_json(dependency_map)
+        _write_json(shared_methods)
         print(
             f"Project and external API dependency diagram saved to {output_dot_file_projects.replace('.dot', '.pdf')}"
         )
@@ -91,7 +146,7 @@ def main():
 
     except Exception as e:
         # Log any exceptions that occur
-        logger.error(f"An error occurred: {str(e)}")
+        logger.error("An error occurred: %s", e)
 
 
 if __name__ == "__main__":
@@ -1,54 +1,431 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import json
 import os
+import re
+import threading
+
+# Extensions of the files gathered for each project, matched case-insensitively since
+# Windows file names are
+_EXT_PATTERN = re.compile(
+    r"\.(?:vbproj|js|resx|json|sln|asax|aspx|vb|vue|html)\Z", re.IGNORECASE
+)
+_EXT_RE = _EXT_PATTERN.search
+
+# Version control, IDE, build output and package directories that are never descended
+# into; they can hold far more files than the sources themselves
+_SKIP_DIRS = frozenset(
+    {
+        ".git",
+        ".svn",
+        ".vs",
+        "node_modules",
+        "bin",
+        "obj",
+        "packages",
+        "__pycache__",
+        ".code_map_cache",
+    }
+)
+
+# Where directories can be opened relative to their parent's descriptor and listed
+# through it, the walk does so; the kernel then resolves one name per directory and
+# file instead of every component of their full paths
+_WALK_FDS = os.scandir in os.supports_fd and os.open in os.supports_dir_fd
+_DIR_FLAGS = os.O_RDONLY | getattr(os, "O_DIRECTORY", 0)
+# Subdirectories are opened without following symlinks, so one swapped for a symlink
+# after being listed is skipped rather than walked, as os.fwalk does
+_SUBDIR_FLAGS = _DIR_FLAGS | getattr(os, "O_NOFOLLOW", 0)
+
+# Metadata of a gathered file, taken while walking so callers don't stat it again
+FileStat = namedtuple("FileStat", ["mtime_ns", "size"])
 
 
 class ProjectAnalyzer:
-    def __init__(self, logger):
+    def __init__(
+        self,
+        logger,
+        max_workers=None,
+        skip_dirs=_SKIP_DIRS,
+        cache_dir=None,
+        collect_stats=False,
+    ):
         """
         Initializes the ProjectAnalyzer with a logger.
 
         Args:
             logger (logging.Logger): Logger instance for logging information.
+            max_workers (int): Number of threads walking projects. Directory walks are
+                I/O-bound, so this defaults to four per CPU, capped at 32.
+            skip_dirs (frozenset): Names of directories not to descend into within
+                projects.
+            cache_dir (str): Directory caching each project's file list between runs.
+                Caching is disabled when omitted.
+            collect_stats (bool): Whether to add a FileStat per file to each project.
+                This costs an lstat per file outside Windows, on cached walks too.
         """
         self.logger = logger
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 4) * 4)
+        self.skip_dirs = skip_dirs
+        self.cache_dir = cache_dir
+        self.collect_stats = collect_stats
+        # Cached file lists are only valid for the same extensions and pruned directories
+        self._cache_signature = hashlib.sha1(
+            "\0".join(
+                [_EXT_PATTERN.pattern, str(_EXT_PATTERN.flags), "\n"]
+                + sorted(skip_dirs)
+            ).encode("utf-8", "surrogateescape")
+        ).hexdigest()
 
     def analyze_projects(self, root_folder_path):
         """
         Analyzes the projects in the specified root folder path.
 
+        Projects are yielded as their walks finish, so a consumer can start on the
+        first project while the rest are still being walked.
+
         Args:
             root_folder_path (str): Path to the root folder containing projects.
 
+        Yields:
+            dict: Project name and file paths, plus a FileStat per file path when
+                collecting stats, in directory order.
+        """
+        # Every directory in the root folder is a project, whatever its name; only
+        # the cache directory is left out in case it lives there
+        cache_dir = (
+            os.path.normcase(os.path.abspath(self.cache_dir))
+            if self.cache_dir is not None
+            else None
+        )
+        try:
+            # Collect each directory in the root folder
+            with os.scandir(root_folder_path) as entries:
+                directories = [
+                    entry
+                    for entry in entries
+                    if entry.is_dir()
+                    and os.path.normcase(os.path.abspath(entry.path)) != cache_dir
+                ]
+        except OSError as e:
+            # Without the root folder there is nothing to analyze
+            self.logger.error("Failed to analyze projects: %s", e)
+            return
+
+        # Walk the projects concurrently; map keeps the results in directory order.
+        # Unreadable subdirectories are skipped by the walker, not raised here.
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for project in executor.map(self._scan_project, directories):
+                if project is not None:
+                    yield project
+
+    def _scan_project(self, directory):
+        """
+        Gathers the relevant files of a single project, logging any failure.
+
+        Runs in a walker thread; a project that fails is left out rather than ending
+        the analysis of the others.
+
+        Args:
+            directory (os.DirEntry): Entry of the project directory.
+
         Returns:
-            list: List of dictionaries containing project names and file paths.
+            dict: Project name and file paths, plus a FileStat per file path when
+                collecting stats, or None if the project could not be analyzed.
         """
-        projects = []
+        self.logger.info("Analyzing project: %s", directory.name)
         try:
-            # Iterate through each directory in the root folder
-            for directory in os.listdir(root_folder_path):
-                dir_path = os.path.join(root_folder_path, directory)
-                if os.path.isdir(dir_path):
-                    self.logger.info(f"Analyzing project: {directory}")
-                    project = {"name": directory, "files": []}
-                    # Recursively gather all relevant files in the project directory
-                    for root, _, files in os.walk(dir_path):
-                        for file in files:
-                            if file.endswith(
-                                (
-                                    ".vbproj",
-                                    ".js",
-                                    ".resx",
-                                    ".json",
-                                    ".sln",
-                                    ".asax",
-                                    ".aspx",
-                                    ".vb",
-                                    ".vue",
-                                    ".html",
-                                )
-                            ):
-                                project["files"].append(os.path.join(root, file))
-                    projects.append(project)
+            return self._gather_project(directory)
         except Exception as e:
-            # Log any errors that occur during project analysis
-            self.logger.error(f"Failed to analyze projects: {str(e)}")
-        return projects
+            self.logger.error("Failed to analyze project %s: %s", directory.name, e)
+            return None
+
+    def _gather_project(self, directory):
+        """
+        Gathers the relevant files of a single project.
+
+        Args:
+            directory (os.DirEntry): Entry of the project directory.
+
+        Returns:
+            dict: Project name and file paths, plus a FileStat per file path when
+                collecting stats.
+        """
+        collect_stats = self.collect_stats
+        files = self._load_cached_files(directory.path)
+        if files is not None:
+            if not collect_stats:
+                return {"name": directory.name, "files": files}
+            # File metadata changes without touching the directory mtimes the cache is
+            # checked against, so it is read afresh rather than cached
+            try:
+                stats = {path: _file_stat(os.lstat(path)) for path in files}
+            except OSError:
+                pass
+            else:
+                return {"name": directory.name, "files": files, "stats": stats}
+
+        # Recursively gather all relevant files in the project directory
+        dir_mtimes = {} if self.cache_dir is not None else None
+        errors = []
+        walk = _walk_files(
+            directory.path,
+            self.skip_dirs,
+            dir_mtimes,
+            onerror=errors.append,
+            match=_EXT_RE,
+        )
+        if collect_stats:
+            files = []
+            stats = {}
+            for path, entry in walk:
+                try:
+                    # Free on Windows, where scandir already read it; one lstat
+                    # relative to the open directory elsewhere
+                    stat = entry.stat(follow_symlinks=False)
+                except OSError as error:
+                    errors.append(error)
+                    continue
+                files.append(path)
+                stats[path] = _file_stat(stat)
+        else:
+            # A comprehension appends each path without a method call per file
+            files = [path for path, _ in walk]
+        for error in errors:
+            self.logger.warning("Skipping unreadable path: %s", error)
+
+        # A walk that skipped directories or files is incomplete, so don't cache it
+        if dir_mtimes is not None and not errors:
+            self._save_cached_files(directory.path, dir_mtimes, files)
+        if not collect_stats:
+            return {"name": directory.name, "files": files}
+        return {"name": directory.name, "files": files, "stats": stats}
+
+    def _cache_file(self, dir_path):
+        """
+        Returns the path of the file list cache for a project directory.
+
+        Args:
+            dir_path (str): Path to the project directory.
+
+        Returns:
+            str: Path to the cache file.
+        """
+        key = hashlib.sha1(os.fsencode(dir_path)).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load_cached_files(self, dir_path):
+        """
+        Loads a project's cached file list if none of its directories changed.
+
+        A directory's mtime changes whenever an entry is added, removed or renamed in
+        it, so matching mtimes for every walked directory mean the same files would be
+        found; checking them costs one stat per directory instead of a full walk.
+
+        Args:
+            dir_path (str): Path to the project directory.
+
+        Returns:
+            list: Cached file paths, or None if there is no valid cache.
+        """
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._cache_file(dir_path), "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            # Anything but the shape written by _save_cached_files is rebuilt
+            if (
+                not isinstance(cache, dict)
+                or cache.get("signature") != self._cache_signature
+            ):
+                return None
+            dirs = cache.get("dirs")
+            files = cache.get("files")
+            if (
+                not isinstance(dirs, dict)
+                or not isinstance(files, list)
+                or not all(isinstance(file, str) for file in files)
+            ):
+                return None
+            for path, mtime_ns in dirs.items():
+                if os.stat(path).st_mtime_ns != mtime_ns:
+                    return None
+        except (OSError, ValueError):
+            return None
+        self.logger.info("Using cached file list for %s", dir_path)
+        return files
+
+    def _save_cached_files(self, dir_path, dir_mtimes, files):
+        """
+        Saves a project's file list along with the mtimes of the walked directories.
+
+        Args:
+            dir_path (str): Path to the project directory.
+            dir_mtimes (dict): mtime in nanoseconds of each walked directory, keyed by
+                path.
+            files (list): File paths found.
+        """
+        cache_file = self._cache_file(dir_path)
+        # Write to a private temporary file and swap it in, so readers never see a
+        # partially written cache
+        temp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temp_file, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "signature": self._cache_signature,
+                        "dirs": dir_mtimes,
+                        "files": files,
+                    },
+                    f,
+                )
+            os.replace(temp_file, cache_file)
+        except OSError as e:
+            self.logger.warning("Failed to cache file list for %s: %s", dir_path, e)
+
+
+def _file_stat(stat):
+    """
+    Keeps the metadata of a file that callers need from a stat result.
+
+    Args:
+        stat (os.stat_result): Result of stat-ing the file.
+
+    Returns:
+        FileStat: mtime in nanoseconds and size of the file.
+    """
+    return FileStat(stat.st_mtime_ns, stat.st_size)
+
+
+def _walk_files(top, skip_dirs=frozenset(), dir_mtimes=None, onerror=None, match=None):
+    """
+    Recursively yields the files below a directory.
+
+    A drop-in for os.walk built on os.scandir: the directory entries already know
+    whether they are directories, so no extra stat calls are needed. Like os.walk,
+    symlinked directories are not descended into, unreadable directories are skipped
+    and directories are visited in the same order.
+
+    Where the platform supports it, each directory is opened relative to its parent's
+    descriptor and listed through its own, like os.fwalk, so no full path is resolved
+    again; the entries' stat() then also works relative to the open directory.
+
+    Args:
+        top (str): Path to the directory to walk.
+        skip_dirs (frozenset): Names of directories to prune without descending.
+        dir_mtimes (dict): When given, filled with the mtime in nanoseconds of each
+            directory read, taken before reading it.
+        onerror (callable): Called with the OSError of each directory that cannot be
+            read; only that directory's subtree is skipped.
+        match (callable): When given, only files whose name it returns a non-None
+            result for are yielded, such as a compiled pattern's search. Filtering in
+            the walk saves building and yielding an item for every other file.
+
+    Yields:
+        tuple: Path and os.DirEntry of each file found. The entry's stat() may only
+            work until the next item is requested.
+    """
+    if _WALK_FDS:
+        return _walk_files_fd(top, skip_dirs, dir_mtimes, onerror, match)
+    return _walk_files_path(top, skip_dirs, dir_mtimes, onerror, match)
+
+
+def _walk_files_fd(top, skip_dirs, dir_mtimes, onerror, match):
+    """
+    Walks a directory tree through directory descriptors; see _walk_files.
+
+    Only the descriptors of the directories from top down to the one being read are
+    open at any time, so deep or wide trees don't exhaust them.
+    """
+    # Bind the lookups used for every directory and entry to locals up front
+    scandir = os.scandir
+    open_dir = os.open
+    close = os.close
+    sep = os.sep
+    # Open directories with their path prefix and the subdirectories left to visit
+    stack = []
+    name, parent_fd, prefix = top, None, ""
+    try:
+        while True:
+            try:
+                fd = open_dir(
+                    name,
+                    _DIR_FLAGS if parent_fd is None else _SUBDIR_FLAGS,
+                    dir_fd=parent_fd,
+                )
+            except OSError as error:
+                if onerror is not None:
+                    onerror(error)
+            else:
+                path = prefix + name
+                # Paths are joined onto the prefix, with its separator in place
+                prefix = path + sep
+                subdirectories = []
+                stack.append((fd, prefix, subdirectories))
+                try:
+                    if dir_mtimes is not None:
+                        dir_mtimes[path] = os.fstat(fd).st_mtime_ns
+                    with scandir(fd) as entries:
+                        for entry in entries:
+                            if entry.is_dir():
+                                if (
+                                    not entry.is_symlink()
+                                    and entry.name not in skip_dirs
+                                ):
+                                    subdirectories.append(entry.name)
+                            elif match is None or match(entry.name) is not None:
+                                yield prefix + entry.name, entry
+                    subdirectories.reverse()
+                except OSError as error:
+                    subdirectories.clear()
+                    if onerror is not None:
+                        onerror(error)
+
+            # Descend into the next subdirectory left in the deepest open directory,
+            # closing the directories that are done
+            while stack:
+                parent_fd, prefix, subdirectories = stack[-1]
+                if subdirectories:
+                    name = subdirectories.pop()
+                    break
+                stack.pop()
+                close(parent_fd)
+            else:
+                return
+    finally:
+        # Close what is still open if the walk is abandoned part way
+        for fd, _, _ in stack:
+            close(fd)
+
+
+def _walk_files_path(top, skip_dirs, dir_mtimes, onerror, match):
+    """
+    Walks a directory tree by path; see _walk_files.
+    """
+    stack = [top]
+    # Bind the lookups used for every directory and entry to locals up front
+    scandir = os.scandir
+    pop = stack.pop
+    push = stack.extend
+    while stack:
+        subdirectories = []
+        add_subdirectory = subdirectories.append
+        path = pop()
+        try:
+            if dir_mtimes is not None:
+                dir_mtimes[path] = os.stat(path).st_mtime_ns
+            entries = scandir(path)
+        except OSError as error:
+            if onerror is not None:
+                onerror(error)
+            continue
+        with entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if not entry.is_symlink() and entry.name not in skip_dirs:
+                        add_subdirectory(entry.path)
+                elif match is None or match(entry.name) is not None:
+                    yield entry.path, entry
+        push(reversed(subdirectories))